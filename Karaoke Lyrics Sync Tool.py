@@ -8,36 +8,64 @@
 # - Simpan .lrc
 # - Hotkeys: Space=Play/Pause, Enter=Next, Backspace=Back, Ctrl+S=Save
 
+import array
+import itertools
 import os
 import sys
+import time
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
-from datetime import timedelta
-
-# --- Audio via pygame ---
-try:
-    import pygame
-except ImportError:
-    raise SystemExit("Module 'pygame' belum terpasang. Install dengan: pip install pygame")
 
 APP_TITLE = "Karaoke Lyrics Sync Tool (Single File)"
 SUPPORTED_AUDIO = (".mp3", ".wav")
+AUDIO_FREQUENCY = 44100
+# Buffer mixer lebih besar = callback audio lebih jarang (CPU lebih ringan).
+# get_pos() menghitung data yang sudah diserahkan ke SDL, jadi mendahului suara
+# yang terdengar kira-kira satu buffer; selisih ini dikurangi di get_pos_ms().
+# Bisa di-override lewat env KARAOKE_AUDIO_BUFFER (harus pangkat dua positif).
+try:
+    AUDIO_BUFFER = int(os.environ.get("KARAOKE_AUDIO_BUFFER", "2048"))
+except ValueError:
+    AUDIO_BUFFER = 2048
+if AUDIO_BUFFER <= 0 or AUDIO_BUFFER & (AUDIO_BUFFER - 1):
+    AUDIO_BUFFER = 2048
+BUSY_POLL_INTERVAL = 1.0  # detik; cek get_busy() untuk deteksi lagu selesai
+
+# --- Audio via pygame (di-import saat audio pertama kali di-load) ---
+_pygame = None
+
+def _get_pygame():
+    global _pygame
+    if _pygame is None:
+        try:
+            import pygame
+        except ImportError:
+            # jangan SystemExit: ini dipanggil dari callback Tk, cukup tampilkan error
+            raise RuntimeError("Module 'pygame' belum terpasang. Install dengan: pip install pygame")
+        _pygame = pygame
+    return _pygame
 
 def ms_to_lrc(ms: int) -> str:
     if ms < 0:
         ms = 0
-    td = timedelta(milliseconds=ms)
-    total_seconds = int(td.total_seconds())
-    minutes = total_seconds // 60
-    seconds = total_seconds % 60
-    hundredths = int((ms % 1000) / 10)  # .xx untuk LRC
-    return f"[{minutes:02}:{seconds:02}.{hundredths:02}]"
+    total_seconds, rem_ms = divmod(int(ms), 1000)
+    minutes, seconds = divmod(total_seconds, 60)
+    hundredths = rem_ms // 10  # .xx untuk LRC
+    return f"[{minutes:02d}:{seconds:02d}.{hundredths:02d}]"
+
+def lrc_row(tag: str, line: str) -> str:
+    # satu-satunya format baris "{tag} {lirik}" (preview dan file LRC)
+    return f"{tag} {line}"
 
 class AudioPlayer:
     def __init__(self):
-        pygame.mixer.init()
+        self._music = None  # pygame.mixer.music, tersedia setelah load() pertama
+        self._music_get_pos = lambda: 0  # diganti pygame.mixer.music.get_pos saat load()
+        self._latency_ms = 0  # latency buffer mixer, dihitung setelah mixer.init()
         self.loaded_path = None
         self._is_paused = False
+        self._playing = False  # True saat play atau pause, diatur oleh play/stop
+        self._busy_checked_at = 0.0
 
     def load(self, path: str):
         if not os.path.isfile(path):
@@ -45,43 +73,69 @@ class AudioPlayer:
         ext = os.path.splitext(path)[1].lower()
         if ext not in SUPPORTED_AUDIO:
             raise ValueError(f"Format tidak didukung: {ext}")
-        pygame.mixer.music.load(path)
+        if self._music is None:
+            pygame = _get_pygame()
+            pygame.mixer.init(frequency=AUDIO_FREQUENCY, size=-16, channels=2, buffer=AUDIO_BUFFER)
+            # SDL bisa memakai sample rate lain dari yang diminta
+            freq = pygame.mixer.get_init()[0] or AUDIO_FREQUENCY
+            self._latency_ms = AUDIO_BUFFER * 1000 // freq
+            self._music = pygame.mixer.music
+            self._music_get_pos = self._music.get_pos
+        self._music.load(path)
         self.loaded_path = path
         self._is_paused = False
+        self._playing = False
 
     def play(self):
         if not self.loaded_path:
             return
         # Jika sudah stop/selesai, mulai ulang dari awal
-        pygame.mixer.music.play()
+        self._music.play()
         self._is_paused = False
+        self._playing = True
+        self._busy_checked_at = time.monotonic()
 
     def pause_toggle(self):
         if not self.loaded_path:
             return
         if self._is_paused:
-            pygame.mixer.music.unpause()
+            self._music.unpause()
             self._is_paused = False
         else:
-            pygame.mixer.music.pause()
+            # lagu bisa sudah selesai sebelum poll get_busy() berikutnya;
+            # cek paksa supaya tidak mem-pause stream yang sudah habis
+            self._busy_checked_at = time.monotonic()
+            if not self._music.get_busy():
+                self.play()  # sama seperti Space saat belum play: mulai dari awal
+                return
+            self._music.pause()
             self._is_paused = True
 
     def stop(self):
-        pygame.mixer.music.stop()
+        if self._music is not None:
+            self._music.stop()
         self._is_paused = False
+        self._playing = False
 
     def is_playing(self) -> bool:
-        # get_busy True saat play atau pause; gunakan flag internal untuk info pause
-        return pygame.mixer.music.get_busy()
+        # True saat play atau pause; state dari flag internal, get_busy() hanya
+        # dicek maksimal sekali per BUSY_POLL_INTERVAL untuk menangkap lagu selesai
+        if self._playing and not self._is_paused:
+            now = time.monotonic()
+            if now - self._busy_checked_at >= BUSY_POLL_INTERVAL:
+                self._busy_checked_at = now
+                if not self._music.get_busy():
+                    self._playing = False
+        return self._playing
 
     def is_paused(self) -> bool:
         return self._is_paused
 
     def get_pos_ms(self) -> int:
-        pos = pygame.mixer.music.get_pos()  # ms sejak music.play() terakhir, berhenti saat pause
-        if pos is None or pos < 0:
-            return 0
-        return int(pos)
+        # ms sejak music.play() terakhir, berhenti saat pause; -1 kalau belum play.
+        # Dikurangi latency buffer supaya sesuai dengan yang terdengar.
+        pos = self._music_get_pos() - self._latency_ms
+        return pos if pos > 0 else 0
 
 class KaraokeApp(tk.Tk):
     def __init__(self):
@@ -98,8 +152,17 @@ class KaraokeApp(tk.Tk):
         self.audio = AudioPlayer()
         self.audio_path = None
         self.lyrics_path = None
+        self.audio_basename = ""
+        self.lyrics_basename = ""
+        self._status_tail: list[str] = []  # bagian status yang hanya berubah saat load
+        self._last_status = None
+        self._last_pos_str = "00:00.00"  # posisi terakhir, dipakai ulang saat pause
+        self._last_now = None
+        self._last_next = None
         self.lyrics: list[str] = []
         self.timestamps: list[str] = []  # string LRC "[mm:ss.xx]"
+        self._ts_ms = array.array("i")  # timestamp mentah (ms), selalu sejajar dengan self.timestamps
+        self._preview_rows: list[str] = []  # baris "{tag} {lirik}" di list_preview, juga dipakai saat save
         self.current_index = 0
 
         # UI
@@ -127,12 +190,13 @@ class KaraokeApp(tk.Tk):
 
         self.lbl_now_title = ttk.Label(mid, text="Lirik Sekarang:")
         self.lbl_now_title.grid(row=0, column=0, sticky="w")
-        self.txt_now = tk.Text(mid, height=3, wrap="word")
+        # Label read-only: update cukup lewat config(text=...)
+        self.txt_now = ttk.Label(mid, wraplength=600, anchor="nw", justify="left")
         self.txt_now.grid(row=1, column=0, columnspan=3, sticky="nsew", pady=(2, 8))
 
         self.lbl_next_title = ttk.Label(mid, text="Baris Berikut:")
         self.lbl_next_title.grid(row=2, column=0, sticky="w")
-        self.txt_next = tk.Text(mid, height=3, wrap="word")
+        self.txt_next = ttk.Label(mid, wraplength=600, anchor="nw", justify="left")
         self.txt_next.grid(row=3, column=0, columnspan=3, sticky="nsew", pady=(2, 8))
 
         # Controls
@@ -169,6 +233,12 @@ class KaraokeApp(tk.Tk):
         mid.grid_columnconfigure(0, weight=1)
         mid.grid_rowconfigure(1, weight=1)
         mid.grid_rowconfigure(3, weight=1)
+        mid.bind("<Configure>", self._on_mid_resize)
+
+    def _on_mid_resize(self, event):
+        wrap = max(100, event.width - 16)
+        self.txt_now.config(wraplength=wrap)
+        self.txt_next.config(wraplength=wrap)
 
     def _bind_hotkeys(self):
         self.bind("<space>", lambda e: self.on_pause_toggle())
@@ -179,25 +249,57 @@ class KaraokeApp(tk.Tk):
     # ---------- Helpers ----------
     def _update_text_views(self):
         # Now line
-        now = self.lyrics[self.current_index] if (0 <= self.current_index < len(self.lyrics)) else ""
-        nxt = self.lyrics[self.current_index + 1] if (0 <= self.current_index + 1 < len(self.lyrics)) else ""
+        lyrics = self.lyrics
+        n = len(lyrics)
+        idx = self.current_index
+        now = lyrics[idx] if (0 <= idx < n) else ""
+        nxt = lyrics[idx + 1] if (0 <= idx + 1 < n) else ""
+
+        # lewati widget yang teksnya tidak berubah
+        if now != self._last_now:
+            self.txt_now.config(text=now)
+            self._last_now = now
+        if nxt != self._last_next:
+            self.txt_next.config(text=nxt)
+            self._last_next = nxt
+
+    def _preview_row(self, i: int) -> str:
+        ts = self.timestamps
+        tag = ts[i] if i < len(ts) else "[-]"
+        return lrc_row(tag, self.lyrics[i])
+
+    def _build_preview_list(self):
+        # rebuild penuh hanya saat load lirik
+        tags = itertools.chain(self.timestamps, itertools.repeat("[-]"))
+        self._preview_rows = [lrc_row(tag, line) for tag, line in zip(tags, self.lyrics)]
+        self.list_preview.delete(0, tk.END)
+        self.list_preview.insert(tk.END, *self._preview_rows)
+        self._update_preview_list()
 
-        for widget, text in ((self.txt_now, now), (self.txt_next, nxt)):
-            widget.config(state="normal")
-            widget.delete("1.0", tk.END)
-            widget.insert(tk.END, text.strip())
-            widget.config(state="disabled")
+    def _refresh_preview_row(self, i: int):
+        if not (0 <= i < len(self._preview_rows)):
+            return
+        row = self._preview_row(i)
+        if row == self._preview_rows[i]:
+            return
+        self._preview_rows[i] = row
+        self.list_preview.delete(i)
+        self.list_preview.insert(i, row)
 
     def _update_preview_list(self):
-        self.list_preview.delete(0, tk.END)
-        for i, lyric in enumerate(self.lyrics):
-            tag = self.timestamps[i] if i < len(self.timestamps) else "[-]"
-            self.list_preview.insert(tk.END, f"{tag} {lyric.strip()}")
-
-        if 0 <= self.current_index < self.list_preview.size():
-            self.list_preview.selection_clear(0, tk.END)
-            self.list_preview.selection_set(self.current_index)
-            self.list_preview.see(self.current_index)
+        # cukup update seleksi; baris yang berubah di-refresh lewat _refresh_preview_row
+        idx = self.current_index
+        size = len(self._preview_rows)
+        if 0 <= idx < size:
+            # clear hanya baris yang memang ter-select (bisa juga dipilih user
+            # lewat klik/panah), bukan seluruh list
+            for i in self.list_preview.curselection():
+                if i != idx:
+                    self.list_preview.selection_clear(i)
+            self.list_preview.selection_set(idx)
+            first, last = self.list_preview.yview()
+            if not (first * size <= idx < last * size):
+                self.list_preview.see(idx)
 
     def _update_progress(self):
         total = max(1, len(self.lyrics))
@@ -205,18 +307,35 @@ class KaraokeApp(tk.Tk):
         self.progress["value"] = min(len(self.timestamps), total)
 
     def _tick(self):
-        # update status every 100ms
-        pos_ms = self.audio.get_pos_ms() if self.audio.is_playing() else 0
-        pos_str = ms_to_lrc(pos_ms).strip("[]")
-        status = f"Status: {pos_str} | Baris: {min(len(self.timestamps), len(self.lyrics))}/{len(self.lyrics)}"
-        if self.audio_path:
-            status += f" | Audio: {os.path.basename(self.audio_path)}"
-        if self.lyrics_path:
-            status += f" | Lirik: {os.path.basename(self.lyrics_path)}"
-        if self.audio.is_paused():
-            status += " | PAUSED"
-        self.lbl_status.config(text=status)
-        self.after(100, self._tick)
+        # update status tiap 100ms saat play, 500ms saat pause/stop
+        playing = self.audio.is_playing()
+        paused = self.audio.is_paused()
+        active = playing and not paused
+        if active:
+            self._last_pos_str = ms_to_lrc(self.audio.get_pos_ms()).strip("[]")
+        elif not playing:
+            self._last_pos_str = "00:00.00"
+        pos_str = self._last_pos_str
+        n = len(self.lyrics)
+        m = len(self.timestamps)
+        parts = [f"Status: {pos_str}", f"Baris: {min(m, n)}/{n}"]
+        parts += self._status_tail
+        if paused:
+            parts.append("PAUSED")
+        status = " | ".join(parts)
+        if status != self._last_status:
+            # hanya config label kalau teks berubah
+            self.lbl_status.config(text=status)
+            self._last_status = status
+        self.after(100 if active else 500, self._tick)
+
+    def _update_status_tail(self):
+        tail = []
+        if self.audio_basename:
+            tail.append(f"Audio: {self.audio_basename}")
+        if self.lyrics_basename:
+            tail.append(f"Lirik: {self.lyrics_basename}")
+        self._status_tail = tail
 
     def _ensure_ready(self) -> bool:
         if not self.audio_path:
@@ -238,8 +357,10 @@ class KaraokeApp(tk.Tk):
         try:
             self.audio.load(path)
             self.audio_path = path
+            self.audio_basename = os.path.basename(path)
+            self._update_status_tail()
             self.audio.stop()  # reset
-            messagebox.showinfo("Audio Loaded", os.path.basename(path))
+            messagebox.showinfo("Audio Loaded", self.audio_basename)
         except Exception as e:
             messagebox.showerror("Gagal Load Audio", str(e))
 
@@ -252,17 +373,21 @@ class KaraokeApp(tk.Tk):
             return
         try:
             with open(path, "r", encoding="utf-8") as f:
-                lines = [ln.rstrip("\n") for ln in f.readlines()]
-            # bersihkan: hapus baris kosong di awal/akhir dan normalisasi
-            cleaned = [ln.strip() for ln in lines if ln.strip() != ""]
+                data = f.read()
+            # bersihkan: hapus baris kosong dan normalisasi (sekali strip per baris)
+            # hasil sudah di-strip, jadi tidak perlu strip lagi di tempat lain
+            cleaned = [s for s in (ln.strip() for ln in data.splitlines()) if s]
             if not cleaned:
                 raise ValueError("File lirik kosong.")
             self.lyrics_path = path
+            self.lyrics_basename = os.path.basename(path)
+            self._update_status_tail()
             self.lyrics = cleaned
             self.timestamps = []
+            self._ts_ms = array.array("i")
             self.current_index = 0
             self._update_text_views()
-            self._update_preview_list()
+            self._build_preview_list()
             self._update_progress()
             messagebox.showinfo("Lyrics Loaded", f"{len(self.lyrics)} baris lirik dibaca.")
         except Exception as e:
@@ -302,11 +427,14 @@ class KaraokeApp(tk.Tk):
         # Jika timestamp untuk baris ini sudah ada (karena back), kita overwrite posisi saat ini
         if self.current_index < len(self.timestamps):
             self.timestamps[self.current_index] = tag
+            self._ts_ms[self.current_index] = pos_ms
         else:
             self.timestamps.append(tag)
+            self._ts_ms.append(pos_ms)
 
         self.current_index += 1
         self._update_text_views()
+        self._refresh_preview_row(self.current_index - 1)
         self._update_preview_list()
         self._update_progress()
 
@@ -329,9 +457,11 @@ class KaraokeApp(tk.Tk):
         if not self.timestamps:
             return
         self.timestamps.pop()
+        self._ts_ms.pop()
         if self.current_index > len(self.timestamps):
             self.current_index = len(self.timestamps)
         self._update_text_views()
+        self._refresh_preview_row(len(self.timestamps))
         self._update_preview_list()
         self._update_progress()
 
@@ -344,7 +474,7 @@ class KaraokeApp(tk.Tk):
 
         default_name = "output.lrc"
         if self.audio_path:
-            base = os.path.splitext(os.path.basename(self.audio_path))[0]
+            base = os.path.splitext(self.audio_basename)[0]
             default_name = f"{base}.lrc"
 
         save_path = filedialog.asksaveasfilename(
@@ -357,21 +487,24 @@ class KaraokeApp(tk.Tk):
             return
 
         try:
-            total = len(self.lyrics)
-            with open(save_path, "w", encoding="utf-8") as f:
-                # Optional: metadata header (kosongkan jika tidak perlu)
-                # f.write("[ti:]\n[ar:]\n[al:]\n\n")
-
-                for i in range(total):
-                    ts = self.timestamps[i] if i < len(self.timestamps) else "[-]"
-                    line = self.lyrics[i].strip()
-                    if ts == "[-]":
-                        # Jika belum bertimestamp, pakai terakhir yang ada atau 00:00.00
-                        if self.timestamps:
-                            ts = self.timestamps[-1]
-                        else:
-                            ts = "[00:00.00]"
-                    f.write(f"{ts} {line}\n")
+            timestamps = self.timestamps
+            m = len(timestamps)
+            # Baris bertimestamp sudah terformat di _preview_rows; sisanya
+            # pakai timestamp terakhir yang ada atau 00:00.00
+            ts_fallback = timestamps[-1] if timestamps else "[00:00.00]"
+            rows = itertools.chain(
+                itertools.islice(self._preview_rows, m),
+                (lrc_row(ts_fallback, line) for line in itertools.islice(self.lyrics, m, None)),
+            )
+
+            # Optional: metadata header (kosongkan jika tidak perlu)
+            # rows = itertools.chain(["[ti:]", "[ar:]", "[al:]", ""], rows)
+            body = "\n".join(rows) + "\n"
+
+            # tulis sekaligus dalam mode biner: encode UTF-8 sekali, line ending tetap \n;
+            # buffer file 64 KB
+            with open(save_path, "wb", buffering=65536) as f:
+                f.write(body.encode("utf-8"))
 
             messagebox.showinfo("Tersimpan", f"Berhasil menyimpan:\n{save_path}")
         except Exception as e: